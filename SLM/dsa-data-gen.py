@@ -1,11 +1,50 @@
+import argparse
 import json
 import os
+import sys
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, suppress
+from functools import partial
+
+# orjson is much faster at both parsing and encoding; fall back to the
+# stdlib when it isn't installed. Both _loads and _dumps work on bytes.
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# ijson lets us stream modules out of the course file one at a time
+# instead of materializing the whole course tree.
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # ============================================================
 # CONFIGURATION
 # ============================================================
 INPUT_FILE = "dsa_course.json"
-OUTPUT_FILE = "dsa_training.json"
+OUTPUT_FILE = "dsa_training.jsonl"
+QA_OUTPUT_FILE = "dsa_qa_training.jsonl"
+
+# Number of encoded samples joined per os.write() call, and the largest
+# slice handed to a single os.write()
+WRITE_BATCH_SIZE = 256
+WRITE_CHUNK_SIZE = 16 << 20
+
+# Per-emotion JSONL files written alongside OUTPUT_FILE (--split-by-emotion)
+EMOTION_OUTPUT_TEMPLATE = "dsa_training_{emotion}.jsonl"
+
+# Worker processes used to render modules in parallel (1 = no subprocesses).
+# The bundled course is small enough that a pool costs more than it saves.
+WORKERS = 1
 
 # ============================================================
 # EMOTION CONFIG (MATCHES YOUR APP + SLM LOGIC)
@@ -16,6 +55,7 @@ EMOTIONS = [
     {"emotion": "neutral", "tone": "clear, structured"},
     {"emotion": "confident", "tone": "challenging, interview-focused"}
 ]
+EMOTION_NAMES = tuple(e["emotion"] for e in EMOTIONS)
 
 # VARIANTS = [
 #     "concept",
@@ -27,11 +67,11 @@ EMOTIONS = [
 
 
 # ============================================================
-# BUILD STRUCTURED TUTOR RESPONSE
+# TUTOR RESPONSE TEMPLATE
 # ============================================================
-def build_teaching_response(topic_title, topic_content, emotion_cfg):
-    return f"""Student Emotion: {emotion_cfg['emotion']}
-Tutor Tone: {emotion_cfg['tone']}
+# Parsed once at import time instead of re-evaluating an f-string per sample.
+_TEMPLATE = """Student Emotion: {emotion}
+Tutor Tone: {tone}
 
 Question: Explain {topic_title}
 
@@ -74,102 +114,515 @@ O(1) - Constant space complexity
 KEY TAKEAWAYS:
 • Understand the core concept
 • Practice with examples
-• Apply in problem-solving""".strip()
+• Apply in problem-solving"""
+
+# Everything except the topic fields is constant per emotion, so each emotion
+# gets a fully rendered "shell" with markers where the topic goes. The shells
+# are split on the markers once, so filling one is a single join.
+_MARK_TITLE = "\x00TT\x00"
+_MARK_CONTENT = "\x00TC\x00"
+
+_SHELLS: tuple[str, ...] = tuple(
+    _TEMPLATE.format(
+        emotion=e["emotion"],
+        tone=e["tone"],
+        topic_title=_MARK_TITLE,
+        topic_content=_MARK_CONTENT
+    )
+    for e in EMOTIONS
+)
+
+# ============================================================
+# JSONL LINE ENCODING
+# ============================================================
+# Pre-encoded constant runs of a JSON line (subject, module, topic, emotion,
+# text). The emotion name and the keys around it are fixed per emotion index.
+_LINE_HEAD = b'{"subject":"DSA","module":'
+_LINE_TOPIC = b',"topic":'
+_LINE_EMOTION: tuple[bytes, ...] = tuple(
+    b',"emotion":' + _dumps(name) + b',"text":' for name in EMOTION_NAMES
+)
+_LINE_TAIL = b"}"
+
+# Compact records (--compact) keep only the variable fields and drop the
+# constant boilerplate; expand_compact_sample rebuilds the text at training time
+_COMPACT_EMOTION: tuple[bytes, ...] = tuple(
+    b',"emotion":' + _dumps(e["emotion"])
+    + b',"tone":' + _dumps(e["tone"])
+    + b',"content":'
+    for e in EMOTIONS
+)
+
+# ============================================================
+# BUILD STRUCTURED TUTOR RESPONSE
+# ============================================================
+# The shells contain no characters that need context-dependent escaping, so
+# they are JSON-encoded once here (markers included, as \u0000 escapes) and
+# topic fields are spliced in already escaped.
+_ESCAPED_MARKERS = (_dumps(_MARK_TITLE)[1:-1], _dumps(_MARK_CONTENT)[1:-1])
+
+def _split_shell(shell: bytes) -> tuple[tuple[bytes, ...], tuple[int, ...]]:
+    """Split an escaped shell into constant fragments and the marker slots
+    between them (0 = title, 1 = content)"""
+    fragments = []
+    slots = []
+    while True:
+        hits = [
+            (shell.find(marker), slot)
+            for slot, marker in enumerate(_ESCAPED_MARKERS)
+            if marker in shell
+        ]
+        if not hits:
+            break
+        pos, slot = min(hits)
+        fragments.append(shell[:pos])
+        slots.append(slot)
+        shell = shell[pos + len(_ESCAPED_MARKERS[slot]):]
+    fragments.append(shell)
+    return tuple(fragments), tuple(slots)
+
+_SHELL_LAYOUTS = tuple(_split_shell(_dumps(shell)) for shell in _SHELLS)
+
+def _render_encoded_texts(
+    title_esc: bytes, content_esc: bytes
+) -> tuple[bytes, ...]:
+    """Render a topic's responses as JSON string literals, in EMOTIONS order
+
+    title_esc and content_esc are the JSON-escaped topic fields (without
+    quotes), escaped once per topic instead of once per emotion. They are
+    placed between fixed fragments and never rescanned for markers.
+    """
+    join = b"".join
+    fields = (title_esc, content_esc)
+    texts = []
+    for fragments, slots in _SHELL_LAYOUTS:
+        parts = [fragments[0]]
+        for slot, fragment in zip(slots, fragments[1:]):
+            parts.append(fields[slot])
+            parts.append(fragment)
+        texts.append(join(parts))
+    return tuple(texts)
+
+def build_teaching_response(
+    topic_title: str, topic_content: str, emotion_cfg: dict[str, str]
+) -> str:
+    return _TEMPLATE.format_map({
+        "topic_title": topic_title,
+        "topic_content": topic_content,
+        "emotion": emotion_cfg["emotion"],
+        "tone": emotion_cfg["tone"]
+    })
+
+def expand_compact_sample(record: dict) -> dict[str, str]:
+    """Rebuild a full training sample from a compact record
+
+    Meant for the training side, e.g. dataset.map(expand_compact_sample).
+    """
+    return {
+        "subject": record["subject"],
+        "module": record["module"],
+        "topic": record["topic"],
+        "emotion": record["emotion"],
+        "text": build_teaching_response(record["topic"], record["content"], record)
+    }
+
+def collate_compact(batch: list[dict]) -> list[str]:
+    """DataLoader collate_fn: expand a batch of compact records into response texts"""
+    return [
+        build_teaching_response(record["topic"], record["content"], record)
+        for record in batch
+    ]
 
 # ============================================================
 # GENERATE TRAINING DATA
 # ============================================================
-def generate_training_data(input_file):
-    """Generate emotion-aware training examples from DSA course data"""
+# Shared by every topic without its own content; escaped once up front
+_DEFAULT_CONTENT = sys.intern(
+    "This is an important Data Structures and Algorithms concept."
+)
+_ESCAPED_DEFAULT_CONTENT = _dumps(_DEFAULT_CONTENT)[1:-1]
+
+def _normalize_module(module: dict) -> dict:
+    """Fill in missing titles/content once so the hot loop can subscript directly
+
+    Titles keep their original value, since they are also written out as the
+    "topic" field; string titles are interned. Content only ever appears in
+    the response text, so non-string content is coerced with str() the way
+    the original f-string template rendered it (e.g. null -> "None") and
+    interned, so topics sharing _DEFAULT_CONTENT share one object.
+    """
+    intern = sys.intern
+    module.setdefault("title", "Module")
+    for topic in module.setdefault("topics", []):
+        title = topic.setdefault("title", "Topic")
+        if isinstance(title, str):
+            topic["title"] = intern(title)
+        content = topic.get("content", _DEFAULT_CONTENT)
+        topic["content"] = intern(
+            content if isinstance(content, str) else str(content)
+        )
+    return module
+
+def _iter_modules(input_file: str) -> Iterator[dict]:
+    """Yield course modules one at a time
+
+    With ijson installed only one module is held in memory at a time;
+    otherwise the whole file is read up front and parsed in one call.
+    """
+    if ijson is None:
+        with open(input_file, 'rb') as f:
+            course = _loads(f.read())
+        print(f"Processing course: {course.get('course_name', 'DSA Course')}")
+        for module in course.get("modules", []):
+            yield _normalize_module(module)
+        return
+    
+    with open(input_file, 'rb') as f:
+        course_name = next(ijson.items(f, "course_name"), "DSA Course")
+        print(f"Processing course: {course_name}")
+        f.seek(0)
+        # use_float keeps numbers as int/float, matching the json path
+        for module in ijson.items(f, "modules.item", use_float=True):
+            yield _normalize_module(module)
+
+def _iter_module_lines(module: dict) -> Iterator[tuple[int, bytes]]:
+    """Yield a normalized module's samples as (emotion index, JSONL line)
+
+    Each line is assembled from pre-escaped pieces: the module title once per
+    module, the line head and topic fields once per topic.
+    """
+    render_encoded_texts = _render_encoded_texts
+    line_emotion = _LINE_EMOTION
+    line_tail = _LINE_TAIL
+    join = b"".join
     
-    # Load course data
-    with open(input_file, 'r', encoding='utf-8') as f:
-        course = json.load(f)
+    module_json = _dumps(module["title"])
     
-    training_examples = []
+    for topic in module["topics"]:
+        topic_title = topic["title"]
+        topic_content = topic["content"]
+        title_json = _dumps(topic_title)
+        head = join((_LINE_HEAD, module_json, _LINE_TOPIC, title_json))
+        # The response text renders the title the way the f-string did
+        if isinstance(topic_title, str):
+            title_esc = title_json[1:-1]
+        else:
+            title_esc = _dumps(str(topic_title))[1:-1]
+        
+        # Generate training example for each emotion and variant
+        # for emotion_cfg in EMOTIONS:
+        #     for variant in VARIANTS:
+        #         yield {
+        #             "subject": "DSA",
+        #             "module": module_title,
+        #             "topic": topic_title,
+        #             "emotion": emotion_cfg["emotion"],
+        #             "variant": variant,
+        #             "text": build_teaching_response(
+        #                 topic_title,
+        #                 topic_content,
+        #                 emotion_cfg,
+        #                 variant
+        #             )
+        #         }
+
+        # Normalization interns content, so the fallback is an identity check
+        if topic_content is _DEFAULT_CONTENT:
+            content_esc = _ESCAPED_DEFAULT_CONTENT
+        else:
+            content_esc = _dumps(topic_content)[1:-1]
+        texts = render_encoded_texts(title_esc, content_esc)
+        
+        for i, (emotion_field, text) in enumerate(zip(line_emotion, texts)):
+            yield i, join((head, emotion_field, text, line_tail))
+
+def _iter_module_compact_lines(module: dict) -> Iterator[tuple[int, bytes]]:
+    """Yield a normalized module's samples as (emotion index, compact record)"""
+    compact_emotion = _COMPACT_EMOTION
+    line_tail = _LINE_TAIL
+    join = b"".join
     
-    print(f"Processing course: {course.get('course_name', 'DSA Course')}")
+    module_json = _dumps(module["title"])
     
-    for module in course.get("modules", []):
-        module_title = module.get("title", "Module")
+    for topic in module["topics"]:
+        head = join((_LINE_HEAD, module_json, _LINE_TOPIC, _dumps(topic["title"])))
+        content_json = _dumps(topic["content"])
         
-        for topic in module.get("topics", []):
-            topic_title = topic.get("title", "Topic")
-            topic_content = topic.get(
-                "content",
-                "This is an important Data Structures and Algorithms concept."
-            )
-            
-            # Generate training example for each emotion and variant
-            # for emotion_cfg in EMOTIONS:
-            #     for variant in VARIANTS:
-            #         training_examples.append({
-            #             "subject": "DSA",
-            #             "module": module_title,
-            #             "topic": topic_title,
-            #             "emotion": emotion_cfg["emotion"],
-            #             "variant": variant,
-            #             "text": build_teaching_response(
-            #                 topic_title,
-            #                 topic_content,
-            #                 emotion_cfg,
-            #                 variant
-            #             )
-            #         })
-
-            for emotion_cfg in EMOTIONS:
-                training_examples.append({
-                    "subject": "DSA",
-                    "module": module_title,
-                    "topic": topic_title,
-                    "emotion": emotion_cfg["emotion"],
-                    "text": build_teaching_response(
-                        topic_title,
-                        topic_content,
-                        emotion_cfg
-                    )
-                })
-
-    
-    print(f"✅ Generated {len(training_examples)} emotion-aware training samples")
-    return training_examples
+        for i, emotion_field in enumerate(compact_emotion):
+            yield i, join((head, emotion_field, content_json, line_tail))
+
+def _emit_qa_samples(topic: dict) -> Iterator[bytes]:
+    """Yield a topic's Q&A training examples as encoded JSONL lines"""
+    title = topic["title"]
+    
+    # Type 1: What is this topic?
+    yield _dumps({
+        "text": f"Question: What is {title}?\nAnswer: {topic['content']}"
+    })
+    
+    # Type 2: Key points
+    if topic.get("key_points"):
+        key_points_text = "\n".join([f"• {point}" for point in topic["key_points"]])
+        yield _dumps({
+            "text": f"Question: What are the key points of {title}?\nAnswer:\n{key_points_text}"
+        })
+    
+    # Type 3: Code examples
+    for code_ex in topic.get("code_examples") or ():
+        yield _dumps({
+            "text": f"Question: Show me code example for {title}\nAnswer:\n```cpp\n{code_ex['code']}\n```\nOutput: {code_ex.get('output', 'N/A')}"
+        })
+    
+    # Type 4: Video references
+    for video in topic.get("videos") or ():
+        yield _dumps({
+            "text": f"Question: Where can I learn about {title}?\nAnswer: Watch this video: {video['title']} - {video['youtube_url']}"
+        })
+
+def _process_module(
+    module: dict, compact: bool = False, qa: bool = False
+) -> tuple[list[tuple[int, bytes]], list[bytes]]:
+    """Worker entry point: encode one module's emotion-aware and Q&A lines"""
+    iter_lines = _iter_module_compact_lines if compact else _iter_module_lines
+    lines = list(iter_lines(module))
+    
+    qa_lines = []
+    if qa:
+        for topic in module["topics"]:
+            qa_lines.extend(_emit_qa_samples(topic))
+    return lines, qa_lines
+
+def generate_course_shards(
+    input_file: str,
+    workers: int = WORKERS,
+    compact: bool = False,
+    qa: bool = False
+) -> Iterator[tuple[list[tuple[int, bytes]], list[bytes]]]:
+    """Yield (emotion lines, Q&A lines) per module from a single course parse
+
+    Modules are independent, so each is rendered and encoded in a separate
+    process; shards are yielded in course order. workers=1 stays in-process.
+    At most 2 * workers modules are in flight, so streamed input stays bounded.
+    Emotion lines are (emotion index, line) pairs; with compact=True the
+    lines are compact records (see
+    expand_compact_sample); with qa=False the Q&A lists are empty.
+    """
+    modules = _iter_modules(input_file)
+    process_module = partial(_process_module, compact=compact, qa=qa)
+    
+    if workers == 1:
+        yield from map(process_module, modules)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for module in modules:
+            pending.append(executor.submit(process_module, module))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
 
 # ============================================================
 # SAVE TRAINING DATA
 # ============================================================
-def save_training_data(training_data, output_file):
-    """Save training data to JSON file"""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(training_data, f, indent=2, ensure_ascii=False)
+def _open_output(
+    stack: ExitStack, path: str, staged: list[tuple[str, str]]
+) -> int:
+    """Open a raw file descriptor on path + ".tmp", closed by stack
+
+    The (temp, final) pair is appended to staged; the caller moves temp files
+    into place only once everything has been written, so a failed run never
+    truncates an existing dataset.
+    """
+    tmp_path = path + ".tmp"
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(tmp_path, flags, 0o644)
+    staged.append((tmp_path, path))
+    stack.callback(os.close, fd)
+    return fd
+
+def _flush_batch(fd: int, batch: list[bytes]) -> None:
+    """Write a batch of encoded lines straight to fd and empty it
+
+    Lines are joined into one bytes object and written with os.write,
+    bypassing the io buffering layer; memoryview slicing handles short
+    writes without copying.
+    """
+    if not batch:
+        return
+    view = memoryview(b"\n".join(batch) + b"\n")
+    while view:
+        view = view[os.write(fd, view[:WRITE_CHUNK_SIZE]):]
+    batch.clear()
+
+def _write_line(fd: int, batch: list[bytes], line: bytes) -> None:
+    """Queue an encoded line for fd, writing the batch once it is full"""
+    batch.append(line)
+    if len(batch) >= WRITE_BATCH_SIZE:
+        _flush_batch(fd, batch)
+
+def save_course_training_data(
+    shards: Iterable[tuple[Iterable[tuple[int, bytes]], Iterable[bytes]]],
+    output_file: str,
+    emotion_files: Sequence[str] | None = None,
+    qa_file: str | None = None
+) -> tuple[int, int]:
+    """Write (emotion lines, Q&A lines) shards to their JSONL files in one pass
+
+    Lines are already encoded (bytes, no trailing newline); emotion-aware
+    lines come as (index into EMOTIONS, line) pairs. If emotion_files is
+    given (one path per entry in EMOTIONS), every emotion-aware line is also
+    written to its emotion's file, reusing the same encoded bytes. Q&A lines
+    go to qa_file.
+
+    Returns the number of emotion-aware and Q&A samples written.
+    """
+    emotion_files = emotion_files or ()
+    if emotion_files and len(emotion_files) != len(EMOTIONS):
+        raise ValueError(
+            f"Expected {len(EMOTIONS)} emotion files, got {len(emotion_files)}"
+        )
+    
+    count = 0
+    qa_count = 0
+    staged = []
+    try:
+        with ExitStack() as stack:
+            main_out = _open_output(stack, output_file, staged)
+            emotion_outs = [
+                _open_output(stack, path, staged) for path in emotion_files
+            ]
+            qa_out = _open_output(stack, qa_file, staged) if qa_file else None
+            batch = []
+            emotion_batches = [[] for _ in emotion_outs]
+            qa_batch = []
+            
+            for lines, qa_lines in shards:
+                for emotion_idx, line in lines:
+                    _write_line(main_out, batch, line)
+                    if emotion_outs:
+                        _write_line(
+                            emotion_outs[emotion_idx],
+                            emotion_batches[emotion_idx],
+                            line
+                        )
+                    count += 1
+                if qa_out is not None:
+                    for line in qa_lines:
+                        _write_line(qa_out, qa_batch, line)
+                        qa_count += 1
+            
+            _flush_batch(main_out, batch)
+            for out, emotion_batch in zip(emotion_outs, emotion_batches):
+                _flush_batch(out, emotion_batch)
+            if qa_out is not None:
+                _flush_batch(qa_out, qa_batch)
+    except BaseException:
+        # Leave any previous outputs untouched and clean up partial files
+        for tmp_path, _ in staged:
+            with suppress(OSError):
+                os.remove(tmp_path)
+        raise
+    
+    for tmp_path, path in staged:
+        os.replace(tmp_path, path)
+    
+    print(f"✅ Generated {count} emotion-aware training samples")
     print(f"✅ Training data saved to {output_file}")
+    for path in emotion_files:
+        print(f"✅ Emotion split saved to {path}")
+    if qa_file:
+        print(f"✅ Generated {qa_count} Q&A training samples")
+        print(f"✅ Q&A data saved to {qa_file}")
+    return count, qa_count
 
 # ============================================================
 # MAIN EXECUTION
 # ============================================================
+def _compact_path(path: str) -> str:
+    """dsa_training.jsonl -> dsa_training_compact.jsonl"""
+    root, ext = os.path.splitext(path)
+    return f"{root}_compact{ext}"
+
 def main():
     """Main function to generate training data"""
+    parser = argparse.ArgumentParser(
+        description="Generate emotion-aware SLM training data from the DSA course"
+    )
+    parser.add_argument(
+        "--compact", "--no-constant-sections",
+        action="store_true",
+        help="write only the variable fields (module, topic, emotion, tone, "
+             "content); rebuild the text at training time with "
+             "expand_compact_sample / collate_compact"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        metavar="N",
+        help=f"worker processes for rendering modules (default: {WORKERS}, "
+             "i.e. in-process)"
+    )
+    parser.add_argument(
+        "--split-by-emotion",
+        action="store_true",
+        help="also write one JSONL file per emotion "
+             f"({EMOTION_OUTPUT_TEMPLATE.format(emotion='<emotion>')})"
+    )
+    parser.add_argument(
+        "--no-qa",
+        action="store_true",
+        help=f"skip the Q&A training data ({QA_OUTPUT_FILE})"
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    
     try:
         # Check if input file exists
         if not os.path.exists(INPUT_FILE):
             print(f"❌ ERROR: Input file '{INPUT_FILE}' not found!")
             return
         
-        # Generate training data
-        training_data = generate_training_data(INPUT_FILE)
+        output_file = OUTPUT_FILE
+        emotion_files = None
+        if args.split_by_emotion:
+            emotion_files = [
+                EMOTION_OUTPUT_TEMPLATE.format(emotion=name)
+                for name in EMOTION_NAMES
+            ]
+        if args.compact:
+            output_file = _compact_path(output_file)
+            if emotion_files:
+                emotion_files = [_compact_path(path) for path in emotion_files]
+        
+        qa_file = None if args.no_qa else QA_OUTPUT_FILE
         
-        # Save training data
-        save_training_data(training_data, OUTPUT_FILE)
+        # Generate and save both training sets in a single streaming pass
+        shards = generate_course_shards(
+            INPUT_FILE, args.workers, args.compact, qa=qa_file is not None
+        )
+        total_samples, total_qa = save_course_training_data(
+            shards, output_file, emotion_files, qa_file
+        )
         
         # Print summary
         print("=" * 60)
         print("📊 GENERATION SUMMARY:")
         print(f"📁 Input: {INPUT_FILE}")
-        print(f"💾 Output: {OUTPUT_FILE}")
-        print(f"📝 Total samples: {len(training_data)}")
+        print(f"💾 Output: {output_file}")
+        print(f"📝 Total samples: {total_samples}")
         print(f"😊 Emotions per topic: {len(EMOTIONS)}")
+        if qa_file:
+            print(f"💾 Q&A output: {qa_file}")
+            print(f"📝 Q&A samples: {total_qa}")
         print("=" * 60)
         print("🚀 NEXT STEPS:")
-        print("1. Upload dsa_training.json to Google Colab")
+        print(f"1. Upload {output_file} to Google Colab")
+        if args.compact:
+            print("   Expand records with expand_compact_sample() before tokenizing")
         print("2. Train SLM with 1 epoch first")
         print("3. Test with confused vs confident prompts")
         print("4. Fine-tune based on results")